@@ -111,12 +111,19 @@ class viCommandException(Exception):
 class viCommand(bytearray):
     """Representation of a command. Object value is a bytearray of address and length."""
 
+    __slots__ = ('_command_code', '_value_bytes', 'unit', 'access_mode', 'command_name')
+
     # =============================================================
     # CHANGE YOUR COMMAND SET HERE:
     command_set = VITOCAL_WO1C
 
     # =============================================================
 
+    # address -> command name, built on first use from command_set (see _address_index)
+    _address_map = None
+    _address_map_source = None
+    _address_map_size = 0
+
     def __init__(self, command_name):
         """initialize object using the attributes of the chosen command."""
 
@@ -140,14 +147,30 @@ class viCommand(bytearray):
         else:
             return 'read'
 
+    @classmethod
+    def _address_index(cls):
+        """Returns a dict mapping the command address (2 bytes) to the command name."""
+        # rebuild if the command set has been exchanged or commands have been added or removed
+        # note: to change the address of an existing command, replace command_set instead of editing the entry
+        if cls._address_map_source is not cls.command_set or cls._address_map_size != len(cls.command_set):
+            cls._address_map = {}
+            for key, value in cls.command_set.items():
+                # first command wins if an address is defined twice
+                cls._address_map.setdefault(bytes.fromhex(value[ADDRESS]), key)
+            cls._address_map_source = cls.command_set
+            cls._address_map_size = len(cls.command_set)
+        return cls._address_map
+
     @classmethod
     def _from_bytes(cls, b: bytearray):
         """Create command from address b given as byte, only the first two bytes of b are evaluated."""
-        try:
+        address = bytes(b[0:2])
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
             logging.debug(f'Convert {b.hex()} to command')
-            command_name = next(key for key, value in cls.command_set.items() if value[ADDRESS].lower() == b[0:2].hex())
-        except:
-            raise viCommandException(f'No Command matching {b[0:2].hex()}')
+        try:
+            command_name = cls._address_index()[address]
+        except KeyError:
+            raise viCommandException(f'No Command matching {address.hex()}')
         return viCommand(command_name)
 
     def response_length(self, access_mode='read'):
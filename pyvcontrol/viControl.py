@@ -18,12 +18,13 @@
 # ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ##
 
 
-from pyvcontrol.viCommand import viCommand
-from pyvcontrol.viTelegram import viTelegram
-from pyvcontrol.viData import viData
+from pyvcontrol.viCommand import viCommand, viCommandException
+from pyvcontrol.viTelegram import viTelegram, viTelegramException
+from pyvcontrol.viData import viData, viDataException
 import logging
 import serial
-from threading import Lock
+import struct
+from functools import lru_cache
 from deprecated import deprecated
 
 control_set = {
@@ -33,20 +34,70 @@ control_set = {
     'Stopbits': 2,  # 'STOPBITS_TWO',
 }
 
+# control codes, compare received bytes directly against these constants
+RESET_CMD = b'\x04'
+SYNC_CMD = b'\x16\x00\x00'
+ACKNOWLEDGE = b'\x06'
+NOT_INIT = b'\x05'
+ERROR = b'\x15'
+
+# control codes by name
 ctrlcode = {
-    'reset_cmd': b'\x04',
-    'sync_cmd': b'\x16\x00\x00',
-    'acknowledge': b'\x06',
-    'not_init': b'\x05',
-    'error': b'\x15',
+    'reset_cmd': RESET_CMD,
+    'sync_cmd': SYNC_CMD,
+    'acknowledge': ACKNOWLEDGE,
+    'not_init': NOT_INIT,
+    'error': ERROR,
 }
 
+# access modes a command may be executed with, depending on the access mode of the command
+_ALLOWED_ACCESS = {'read': frozenset(('read',)), 'write': frozenset(('read', 'write')), 'call': frozenset(('call',))}
+
+# payload of commands without data
+_EMPTY_PAYLOAD = b''
+
+# precompiled packers for function call payloads (argument count followed by the arguments)
+_CALL_PACKERS = {n: struct.Struct(f'>{n + 1}B').pack for n in range(8)}
+
+
+@lru_cache(maxsize=256)
+def _cached_vicommand(command_name) -> viCommand:
+    # returns a shared viCommand per command name, the same few commands are usually polled repeatedly
+    # the returned objects are shared between calls and must not be modified
+    return viCommand(command_name)
+
+
+# command set (and its size) the cached commands were created from
+_cached_vicommand_source = None
+_cached_vicommand_size = 0
+
+
+def _get_vicommand(command_name) -> viCommand:
+    # returns the cached viCommand, the cache is cleared if viCommand.command_set has been exchanged or commands
+    # have been added or removed. To change an existing command, replace command_set instead of editing the entry
+    global _cached_vicommand_source, _cached_vicommand_size
+    if _cached_vicommand_source is not viCommand.command_set or _cached_vicommand_size != len(viCommand.command_set):
+        _cached_vicommand.cache_clear()
+        _cached_vicommand_source = viCommand.command_set
+        _cached_vicommand_size = len(viCommand.command_set)
+    return _cached_vicommand(command_name)
+
 
 class viControlException(Exception):
     def __init__(self, msg):
         super().__init__(msg)
 
 
+def _function_call_payload(function_args):
+    # payload of a function call: number of arguments followed by the arguments (one byte each)
+    try:
+        if len(function_args) in _CALL_PACKERS:
+            return _CALL_PACKERS[len(function_args)](len(function_args), *function_args)
+        return bytes((len(function_args), *function_args))
+    except (struct.error, ValueError, TypeError):
+        raise viControlException(f'Function call arguments {function_args} must be integers in range 0..255')
+
+
 class viControl:
     # class to connect to viControl heating directly via Optolink
     # only supports WO1C with protocol P300
@@ -55,8 +106,17 @@ class viControl:
         self.vs.connect()
         self.is_initialized = False
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # releases serial port when leaving the with statement
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Command cache: {_cached_vicommand.cache_info()}')
+        self.vs.disconnect()
+
     def __del__(self):
-        # destructor, releases serial port
+        # destructor, releases serial port if not done already (prefer using viControl as context manager)
         self.vs.disconnect()
 
     @deprecated(version='1.3', reason="replaced by execute_read_command")
@@ -66,7 +126,7 @@ class viControl:
 
     def execute_read_command(self, command_name) -> viData:
         """ sends a read command and gets the response."""
-        vc = viCommand(command_name)
+        vc = _get_vicommand(command_name)
         return self.execute_command(vc, 'read')
 
     @deprecated(version='1.3', reason="replaced by execute_write_command")
@@ -76,48 +136,115 @@ class viControl:
 
     def execute_write_command(self, command_name, value) -> viData:
         """ sends a write command and gets the response."""
-        vc = viCommand(command_name)
+        vc = _get_vicommand(command_name)
         vd = viData.create(vc.unit, value)
         return self.execute_command(vc, 'write', payload=vd)
 
-    @deprecated(version='1.3', reason="replaced by execute_write_command")
+    @deprecated(version='1.3', reason="replaced by execute_function_call")
     def execFunctionCall(self, cmdname, *function_args) -> viData:
         """ sends a function call command and gets response."""
-        payload = bytearray((len(function_args), *function_args))
-        return self.execute_command(cmdname, 'call', payload=payload)
+        return self.execute_function_call(cmdname, *function_args)
 
     def execute_function_call(self, command_name, *function_args) -> viData:
         """ sends a function call command and gets response."""
-        payload = bytearray((len(function_args), *function_args))
-        vc = viCommand(command_name)
-        return self.execute_command(vc, 'call', payload=payload)
-
-    def execute_command(self, vc, access_mode, payload=bytes(0)) -> viData:
+        vc = _get_vicommand(command_name)
+        return self.execute_command(vc, 'call', payload=_function_call_payload(function_args))
+
+    def try_execute_function_call(self, command_name, *function_args):
+        """ sends a function call command and gets response, returns None if the heating answers with an error."""
+        return self.execute_function_calls(command_name, [function_args], raise_on_error=False)[0]
+
+    def execute_function_calls(self, command_name, function_args_list, raise_on_error=True) -> list:
+        """ sends a function call for each tuple of arguments in one write and gets the responses (in the same order).
+        if raise_on_error is False, calls answered with an error return None instead of raising viControlException."""
+        vc = _get_vicommand(command_name)
+        self._check_access_mode(vc, 'call')
+        telegrams = [viTelegram(vc, 'call', payload=_function_call_payload(function_args))
+                     for function_args in function_args_list]
+        return self._execute_telegrams(telegrams, 'call', raise_on_error)
+
+    def execute_read_commands(self, command_names) -> list:
+        """ sends several read commands in one write and gets the responses (in the same order)."""
+        commands = [_get_vicommand(command_name) for command_name in command_names]
+        for vc in commands:
+            self._check_access_mode(vc, 'read')
+        telegrams = [viTelegram(vc, 'read') for vc in commands]
+        return self._execute_telegrams(telegrams, 'read')
+
+    def _execute_telegrams(self, telegrams, access_mode, raise_on_error=True) -> list:
+        # sends all telegrams back to back and then receives the responses, saves the round trip per telegram
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Send telegrams {[vt.hex() for vt in telegrams]}')
+        self.vs.send(b''.join(telegrams))
+        # all responses are read before an error response is raised, otherwise the remaining responses would be
+        # left in the input and read as responses to later commands
+        # the same holds for a response whose payload cannot be decoded, the first such error is raised afterwards
+        results = []
+        decode_error = None
+        for vt in telegrams:
+            try:
+                results.append(self._receive_response(vt, access_mode, raise_on_error=False))
+            except viDataException as e:
+                # the response was received and acknowledged, only its payload is invalid
+                decode_error = decode_error or e
+                results.append(None)
+        if decode_error is not None:
+            raise decode_error
+        if raise_on_error and any(vd is None for vd in results):
+            raise viControlException(f'{access_mode} command returned an error')
+        return results
 
+    def execute_command(self, vc, access_mode, payload=_EMPTY_PAYLOAD) -> viData:
         # prepare command
-        allowed_access_mode = {'read': ['read'], 'write': ['read', 'write'], 'call': ['call']}
-        if access_mode not in allowed_access_mode[vc.access_mode]:
-            raise viControlException(
-                f'command {vc.command_name} allows only {allowed_access_mode[vc.access_mode]} access')
+        self._check_access_mode(vc, access_mode)
 
         # send Telegram
         vt = viTelegram(vc, access_mode, payload=payload)
-        logging.debug(f'Send telegram {vt.hex()}')
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Send telegram {vt.hex()}')
         self.vs.send(vt)
 
+        return self._receive_response(vt, access_mode)
+
+    def _check_access_mode(self, vc, access_mode):
+        if access_mode not in _ALLOWED_ACCESS[vc.access_mode]:
+            raise viControlException(
+                f'command {vc.command_name} allows only {sorted(_ALLOWED_ACCESS[vc.access_mode])} access')
+
+    def _receive_response(self, vt, access_mode, raise_on_error=True) -> viData:
+        # receives acknowledge and response to the sent telegram vt
+        # error responses raise viControlException or, if raise_on_error is False, return None
+        # hex formatting of the telegrams is only done if debug messages are logged
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
         # Check if sending was successful
         ack = self.vs.read(1)
-        logging.debug(f'Received  {ack.hex()}')
-        if ack != ctrlcode['acknowledge']:
+        if debug:
+            logging.debug(f'Received  {ack.hex()}')
+        if ack != ACKNOWLEDGE:
+            # communication is out of step, discard what is left of the response(s)
+            self.vs.reset_input_buffer()
             raise viControlException(f'Expected acknowledge byte, received {ack}')
 
         # Receive response and evaluate data
         vr = self.vs.read(vt.response_length)  # receive response
-        vt = viTelegram.from_bytes(vr)
-        logging.debug(f'Requested {vt.response_length} bytes. Received telegram {vr.hex()}')
+        if vr[4:6] != vt.vicmd[0:2]:
+            # e.g. a response left over from an earlier command, discard what is left of the response(s)
+            self.vs.reset_input_buffer()
+            raise viControlException(f'Response {vr.hex()} does not match command {vt.vicmd.hex()}')
+        try:
+            vt = viTelegram.from_bytes(vr)
+        except (viTelegramException, viCommandException):
+            self.vs.reset_input_buffer()
+            raise
+        if debug:
+            logging.debug(f'Requested {vt.response_length} bytes. Received telegram {vr.hex()}')
+        # error telegrams are acknowledged like any other correctly received telegram
+        self.vs.send(ACKNOWLEDGE)
         if vt.tType == viTelegram.tTypes['error']:
-            raise viControlException(f'{access_mode} command returned an error')
-        self.vs.send(ctrlcode['acknowledge'])  # send acknowledge
+            if raise_on_error:
+                raise viControlException(f'{access_mode} command returned an error')
+            return None
 
         # return viData object from payload
         return viData.create(vt.vicmd.unit, vt.payload)
@@ -131,31 +258,48 @@ class viControl:
         self.is_initialized = False
 
         # loop cases
-        # 1 - ii=0: read timeout -> send reset / ii=1: not_init, send sync / ii=2:  Initialization successful
+        # 1 - ii=0: read timeout -> send reset and sync / ii=1:  Initialization successful
+        # 1 - ii=0: read timeout -> send reset and sync / ii=1: not_init (sync not yet processed), wait
+        #     / ii=2: Initialization successful
         # 1 - ii=0: error -> send reset / ii=1: not_init, send sync / ii=2:  Initialization successful
         # 2 - ... ii=10: exit loop, give up
 
+        sync_pending = False  # sync was sent together with the reset and is not answered yet
         for ii in range(0, 10):
             # loop until interface is initialized
-            read_byte = self.vs.read(1)
-            if read_byte == ctrlcode['acknowledge']:
+            # first step: do not wait for the full read timeout, a silent interface is reset and synced right away
+            read_byte = self.vs.read(1, retries=1 if ii == 0 else 10)
+            if read_byte == ACKNOWLEDGE:
                 # Schnittstelle hat auf den Initialisierungsstring mit OK geantwortet. Die Abfrage von Werten kann beginnen.
                 logging.debug(f'Step {ii}: Initialization successful')
                 self.is_initialized = True
                 break
-            elif read_byte == ctrlcode['not_init']:
+            elif read_byte == NOT_INIT and sync_pending:
+                # not_init was sent before the interface processed the sync sent with the reset
+                # a second sync would be answered with a second acknowledge, which would be read as acknowledge
+                # of the first telegram -> wait for the acknowledge of the first sync instead
+                logging.debug(f'Step {ii}: Viessmann ready, not initialized, sync already sent')
+                sync_pending = False
+            elif read_byte == NOT_INIT:
                 # Schnittstelle ist zurückgesetzt und wartet auf Daten; Antwort b'\x05' = Warten auf Initialisierungsstring
                 logging.debug(f'Step {ii}: Viessmann ready, not initialized, send sync')
-                self.vs.send(ctrlcode['sync_cmd'])
-            elif read_byte == ctrlcode['error']:
+                self.vs.send(SYNC_CMD)
+            elif read_byte == ERROR:
                 # in case of error try to reset
                 logging.error(f'The interface has reported an error (\x15), loop increment {ii}')
                 logging.debug(f'Step {ii}: Send reset')
-                self.vs.send(ctrlcode['reset_cmd'])
+                self.vs.send(RESET_CMD)
+                sync_pending = False
+            elif len(read_byte) == 0 and ii == 0:
+                # nothing received at first: send reset and sync in one write, saves the round trip waiting for not_init
+                logging.debug(f'Nothing received. Step {ii}: Send reset and sync')
+                self.vs.send(RESET_CMD + SYNC_CMD)
+                sync_pending = True
             else:
                 # send reset
                 logging.debug(f'Received [{read_byte}]. Step {ii}: Send reset')
-                self.vs.send(ctrlcode['reset_cmd'])
+                self.vs.send(RESET_CMD)
+                sync_pending = False
 
         if not self.is_initialized:
             # initialisation not successful
@@ -168,7 +312,6 @@ class viControl:
 class viSerial():
     # low-level communication interface
     # FIXME: control sets nicht übernommen
-    _viessmann_lock = Lock()
 
     # viControl socket: implement raw communication
     def __init__(self, control_set, port):
@@ -176,39 +319,39 @@ class viSerial():
         self._control_set = control_set
         self._serial_port = port
         self._serial = serial.Serial()
+        self._rx_buffer = bytearray(64)  # reused by read, large enough for all telegrams of the command set
 
     def connect(self):
         # setup serial connection
-        # if not connected, try to acquire lock
+        # the port is claimed exclusively by the open handle, a second connection to the same port fails to open
         if self._connected:
             # do nothing
             logging.debug('Connect: Already connected')
             return
-        if self._viessmann_lock.acquire(timeout=10):
-            try:
-                # initialize serial connection
-                logging.debug('Connecting ...')
-                self._serial.baudrate = self._control_set['Baudrate']
-                self._serial.parity = self._control_set['Parity']
-                self._serial.bytesize = self._control_set['Bytesize']
-                self._serial.stopbits = self._control_set['Stopbits']
-                self._serial.port = self._serial_port
-                self._serial.timeout = 0.25  # read method will try 10 times -> 2.5s max waiting time
-                self._serial.open()
-                self._connected = True
-                logging.debug('Connected to {}'.format(self._serial_port))
-            except Exception as e:
-                logging.error('Could not connect to {}; Error: {}'.format(self._serial_port, e))
-                self._viessmann_lock.release()
-                self._connected = False
-        else:
-            logging.error('Could not acquire lock')
+        try:
+            # initialize serial connection
+            logging.debug('Connecting ...')
+            self._serial.baudrate = self._control_set['Baudrate']
+            self._serial.parity = self._control_set['Parity']
+            self._serial.bytesize = self._control_set['Bytesize']
+            self._serial.stopbits = self._control_set['Stopbits']
+            self._serial.port = self._serial_port
+            self._serial.timeout = 0.25  # read method will try 10 times by default -> 2.5s max waiting time
+            self._serial.exclusive = True  # opening fails while the port is in use
+            self._serial.open()
+        except Exception as e:
+            logging.error('Could not connect to {}; Error: {}'.format(self._serial_port, e))
+            self._connected = False
+            raise viControlException(f'Could not connect to {self._serial_port}') from e
+        self._connected = True
+        logging.debug('Connected to {}'.format(self._serial_port))
 
     def disconnect(self):
-        # release serial line and lock
+        # release serial line, can be called repeatedly
+        if self._serial is None:
+            return
         self._serial.close()
         self._serial = None
-        self._viessmann_lock.release()
         self._connected = False
         logging.debug('Disconnected from viControl')
 
@@ -220,21 +363,37 @@ class viSerial():
         else:
             return False
 
-    def read(self, length):
-        # read bytes from serial connection
-        total_read_bytes = bytearray(0)
+    def reset_input_buffer(self):
+        # discards received bytes that have not been read yet
+        if self._connected:
+            self._serial.reset_input_buffer()
+
+    def drain_input(self):
+        # discards received bytes until nothing arrives within the read timeout
+        # unlike reset_input_buffer this also discards bytes that are still on the line
+        if self._connected:
+            while self._serial.read(len(self._rx_buffer)):
+                pass
+
+    def read(self, length, retries=10):
+        # read bytes from serial connection into the receive buffer, grow buffer if necessary
+        if length > len(self._rx_buffer):
+            self._rx_buffer = bytearray(length)
+        buffer = memoryview(self._rx_buffer)
+        received = 0
         failed_count = 0
-        # FIXME: read length bytes and try ten times if nothing received
-        while failed_count < 10:
-            # try to get one or more bytes
-            read_byte = self._serial.read()
-            total_read_bytes += read_byte
-            if len(total_read_bytes) >= length:
+        # read length bytes and try several times (retries) if nothing received
+        while failed_count < retries:
+            # try to get all missing bytes at once, returns what arrived until timeout
+            read_bytes = self._serial.read(length - received)
+            buffer[received:received + len(read_bytes)] = read_bytes
+            received += len(read_bytes)
+            if received >= length:
                 # exit loop if all bytes are received
                 break
-            if len(read_byte) == 0:
+            if len(read_bytes) == 0:
                 # if nothing received, wait and retry
                 failed_count += 1
-                logging.debug(f'Serial read: retry ({failed_count})')
-        logging.debug(f'Received {len(total_read_bytes)}/{length} bytes')
-        return bytes(total_read_bytes)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Received {received}/{length} bytes, {failed_count} retries')
+        return bytes(buffer[:received])
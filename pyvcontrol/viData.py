@@ -19,7 +19,21 @@
 
 import logging
 from collections import namedtuple
-from struct import unpack
+from struct import Struct, error as StructError
+from sys import intern
+from types import MappingProxyType
+
+# precompiled formats for 2 byte integers (little endian)
+_S16 = Struct('<h')
+_U16 = Struct('<H')
+# bound pack/unpack functions of the formats, indexed by signed (False -> unsigned, True -> signed)
+_PACK16 = (_U16.pack, _S16.pack)
+_UNPACK16 = (_U16.unpack, _S16.unpack)
+_ITER_UNPACK16 = (_U16.iter_unpack, _S16.iter_unpack)
+
+
+# description of a unit that is not implemented yet
+UnitSpec = namedtuple('UnitSpec', ['description', 'type', 'signed', 'read_value_transform'])
 
 
 class viDataException(Exception):
@@ -27,14 +41,53 @@ class viDataException(Exception):
         super().__init__(msg)
 
 
+def _frozen(mapping):
+    # read-only view of a lookup table, string values are interned
+    return MappingProxyType({key: intern(value) if type(value) == str else value for key, value in mapping.items()})
+
+
+def _lookup_encoded(table, value):
+    # encoded bytes of a table value, None if the value is unknown (or cannot be looked up, e.g. a list)
+    try:
+        return table.get(value)
+    except TypeError:
+        return None
+
+
+def _encode_int(value, length, signed):
+    # encodes integer value as little endian bytes, 2 byte values using the precompiled formats
+    try:
+        if length == 2:
+            return _PACK16[signed](value)
+        return value.to_bytes(length, 'little', signed=signed)
+    except (StructError, OverflowError):
+        raise viDataException(f'Value {value} does not fit into {length} bytes')
+
+
+def _decode_int(b, signed):
+    # decodes little endian bytes to integer, 2 byte values using the precompiled formats
+    if len(b) == 2:
+        return _UNPACK16[signed](b)[0]
+    return int.from_bytes(b, 'little', signed=signed)
+
+
+def _decode_int_many(buf, signed):
+    # decodes consecutive 2 byte little endian integers in one pass
+    if len(buf) % 2:
+        raise viDataException(f'Length of buffer ({len(buf)} bytes) is not a multiple of 2')
+    return [v for (v,) in _ITER_UNPACK16[signed](buf)]
+
+
 class viData(bytearray):
     # implements representations of viControl data types
     # erzeugen eines Datentypes über benannte Klasse -> setze code und codiere Parameter als bytes
 
+    __slots__ = ()  # subclasses declare their own slots (no instance __dict__), the length is len(self)
+
     # konstruktor __init__ accepts byte-encoded input or real data
     # property value returns the decoded value (str,int,fixed-point,...)
-    # method _create_from_raw initializes the object with raw byte data
-    # method _create_from_value initializes the object with a typed value
+    # method _create_from_raw validates raw byte data and returns the bytes to store
+    # method _create_from_value encodes a typed value and returns the bytes to store
 
     # Implemented units:
     # BA    : Betriebsart
@@ -50,49 +103,48 @@ class viData(bytearray):
     # FIXME: Units für Temperatur, h, etc. erzeugen
 
     # units not implemented so far:
-    unitset = {
-        'CT': {'description': 'CycleTime', 'type': 'timer', 'signed': False, 'read_value_transform': 'non'},
+    unitset = _frozen({
+        'CT': UnitSpec('CycleTime', 'timer', False, 'non'),
         # vito unit: CT
-        'IU2': {'description': 'INT unsigned 2', 'type': 'integer', 'signed': False, 'read_value_transform': '2'},
+        'IU2': UnitSpec('INT unsigned 2', 'integer', False, '2'),
         # vito unit: UT1U, PR1
-        'IUBOOL': {'description': 'INT unsigned bool', 'type': 'integer', 'signed': False,
-                   'read_value_transform': 'bool'},  # vito unit:
-        'IUINT': {'description': 'INT unsigned int', 'type': 'integer', 'signed': False, 'read_value_transform': 'int'},
+        'IUBOOL': UnitSpec('INT unsigned bool', 'integer', False, 'bool'),  # vito unit:
+        'IUINT': UnitSpec('INT unsigned int', 'integer', False, 'int'),
         # vito unit:
-        'IS2': {'description': 'INT signed 2', 'type': 'integer', 'signed': True, 'read_value_transform': '2'},
+        'IS2': UnitSpec('INT signed 2', 'integer', True, '2'),
         # vito unit: UT1, PR
-        'IS100': {'description': 'INT signed 100', 'type': 'integer', 'signed': True, 'read_value_transform': '100'},
+        'IS100': UnitSpec('INT signed 100', 'integer', True, '100'),
         # vito unit:
-        'IS1000': {'description': 'INT signed 1000', 'type': 'integer', 'signed': True, 'read_value_transform': '1000'},
+        'IS1000': UnitSpec('INT signed 1000', 'integer', True, '1000'),
         # vito unit:
-        'ISNON': {'description': 'INT signed non', 'type': 'integer', 'signed': True, 'read_value_transform': 'non'},
+        'ISNON': UnitSpec('INT signed non', 'integer', True, 'non'),
         # vito unit:
-        'SC': {'description': 'SystemScheme', 'type': 'list', 'signed': False, 'read_value_transform': 'non'},
+        'SC': UnitSpec('SystemScheme', 'list', False, 'non'),
         # vito unit:
-        'SN': {'description': 'Sachnummer', 'type': 'serial', 'signed': False, 'read_value_transform': 'non'},
+        'SN': UnitSpec('Sachnummer', 'serial', False, 'non'),
         # vito unit:
-        'SR': {'description': 'SetReturnStatus', 'type': 'list', 'signed': False, 'read_value_transform': 'non'},
+        'SR': UnitSpec('SetReturnStatus', 'list', False, 'non'),
         # vito unit:
-        'TI': {'description': 'SystemTime', 'type': 'datetime', 'signed': False, 'read_value_transform': 'non'},
+        'TI': UnitSpec('SystemTime', 'datetime', False, 'non'),
         # vito unit: TI
-        'DA': {'description': 'Date', 'type': 'date', 'signed': False, 'read_value_transform': 'non'},  # vito unit:
-    }
+        'DA': UnitSpec('Date', 'date', False, 'non'),  # vito unit:
+    })
 
     def __init__(self, value):
         """ to be overridden by subclass. subclass __init__ shall set default value for value and handle any extra parameters """
-        super().__init__()
+        # the bytes are determined first so that the bytearray is initialized once with its final size
         if type(value) == bytes or type(value) == bytearray:
-            self._create_from_raw(value)
+            payload = self._create_from_raw(value)
         else:
-            self._create_from_value(value)
+            payload = self._create_from_value(value)
+        super().__init__(payload)
 
     def _create_from_raw(self, value):
-        # fill using byte values
-        super().extend(value)
-        self.len = len(value)
+        # returns byte values
+        return value
 
     def _create_from_value(self, value):
-        # fill using type and value
+        # returns bytes for type and value
         # empty declaration, must be overridden by subclass
         raise NotImplementedError
 
@@ -106,16 +158,13 @@ class viData(bytearray):
     def create(cls, datatype, *args):
         # select data type object based on type
         # args are passed as such to the constructor of the function
-        logging.debug(f'Data factory: request to produce Data type {datatype} with args {args}')
-        datatype_object = {'BA': viDataBA, 'DT': viDataDT, 'IS10': viDataIS10, 'IU10': viDataIU10,
-                           'IU3600': viDataIU3600, 'IUNON': viDataIUNON, 'RT': viDataRT, 'OO': viDataOO,
-                           'ES': viDataES, 'F_E': viDataEnergy,
-                           }
-        if datatype in datatype_object.keys():
-            return datatype_object[datatype](*args)
-        else:
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Data factory: request to produce Data type {datatype} with args {args}')
+        datatype_class = _DATATYPE_OBJECT.get(datatype)
+        if datatype_class is None:
             # if unit type is not implemented
             raise viDataException(f'Unit {datatype} not known')
+        return datatype_class(*args)
 
 
 # ----------------------------------------
@@ -123,43 +172,52 @@ class viData(bytearray):
 
 class viDataBA(viData):
     # Betriebsart
+    __slots__ = ('_value',)  # decoded value, set on creation
     unit = {'code': 'BA', 'description': 'Betriebsart', 'unit': ''}
     # operating mode codes are hex numbers
-    operatingmodes = {
+    operatingmodes = _frozen({
         0x00: 'OFF',
         0x01: 'WW',
         0x02: 'HEATING_WW',
-     }
+     })
+    # encoded code byte of each value
+    operatingmodes_encoded = _frozen({value: bytes((key,)) for key, value in operatingmodes.items()})
+    operatingmodes_options = ', '.join(operatingmodes.values())  # listed in error messages
+    # validity of a raw code byte, indexed by the byte (1 = known code)
+    operatingmodes_valid = bytes(map(operatingmodes.__contains__, range(256)))
 
     def __init__(self, value=b'\x00'):
         # sets operating mode (hex) based on value
         super().__init__(value)
 
     def _create_from_value(self, opmode):
-        if opmode in self.operatingmodes.values():
-            opcode = next(key for key, value in self.operatingmodes.items() if value == opmode)
-            super().extend(opcode.to_bytes(1, 'little'))
+        raw = _lookup_encoded(self.operatingmodes_encoded, opmode)
+        if raw is not None:
+            self._value = self.operatingmodes[raw[0]]
+            return raw
         else:
-            raise viDataException(f'Unknown operating mode {opmode}. Options are {self.operatingmodes.values()}')
+            raise viDataException(f'Unknown operating mode {opmode}. Options are {self.operatingmodes_options}')
 
     def _create_from_raw(self, value):
         # set raw value directly
-        if int.from_bytes(value, 'little') in self.operatingmodes.keys():
-            super().extend(value)
+        if len(value) == 1 and self.operatingmodes_valid[value[0]]:
+            self._value = self.operatingmodes[value[0]]
+            return value
         else:
             raise viDataException(f'Unknown operating mode {value.hex()}')
 
     @property
     def value(self):
         # returns decoded value
-        return self.operatingmodes[int.from_bytes(self, 'little')]
+        return self._value
 
 
 class viDataES(viData):
     # ERROR states
+    __slots__ = ('_value',)  # decoded value, set on creation
     unit = {'code': 'ES', 'description': 'Error', 'unit': ''}
     # error codes are hex numbers
-    errorset = {
+    errorset = _frozen({
         0x00: 'Regelbetrieb (kein Fehler)',
         0x0F: 'Wartung (fuer Reset Codieradresse 24 auf 0 stellen)',
         0x10: 'Kurzschluss Aussentemperatursensor',
@@ -225,7 +283,9 @@ class viDataES(viData):
         0xFD: 'Fehler Gasfeuerungsautomat',
         0xFE: 'Starkes Stoerfeld (EMV) in der Naehe oder Elektronik defekt',
         0xFF: 'Starkes Stoerfeld (EMV) in der Naehe oder interner Fehler',
-    }
+    })
+    # error text indexed by the error code byte, None for unknown codes
+    errorset_table = tuple(map(errorset.get, range(256)))
 
     def __init__(self, value=b'\x00'):
         # default is no error
@@ -235,22 +295,24 @@ class viDataES(viData):
     # Implementation does not make sense, an error will always be raised by the Viessmann unit
 
     def _create_from_raw(self, value):
-        # set raw value directly
-        if int.from_bytes(value, 'big') in self.errorset.keys():
-            super().extend(value)
+        # set raw value directly, error codes are one byte
+        if len(value) == 1 and self.errorset_table[value[0]] is not None:
+            self._value = self.errorset_table[value[0]]
+            return value
         else:
             raise viDataException(f'Unknown error code {value.hex()}')
 
     @property
     def value(self):
         # returns decoded value
-        return self.errorset[int.from_bytes(self, 'big')]
+        return self._value
 
 
 class viDataDT(viData):
     # device types
+    __slots__ = ('_value',)  # decoded value, set on creation
     unit = {'description': 'DeviceType', 'code': 'DT', 'unit': ''}  # vito unit: DT
-    devicetypes = {
+    devicetypes = _frozen({
         0x2098: 'V200KW2, Protokoll: KW2',
         0x2053: 'GWG_VBEM, Protokoll: GWG',
         0x20CB: 'VScotHO1, Protokoll: P300',
@@ -269,7 +331,11 @@ class viDataDT(viData):
         0x2032: 'VBC550, Protokoll: ',
         0x2033: 'VBC550, Protokoll: ',
         0x0000: 'unknown'
-    }
+    })
+    # encoded code of each device name
+    # device names are not unique, the first code of a name is used (dict is built in reverse order)
+    devicetypes_encoded = _frozen({value: key.to_bytes(2, 'big')
+                                   for key, value in reversed(list(devicetypes.items()))})
 
     def __init__(self, value=b'\x00\x00'):
         # sets device name (hex code). Either give value as bytearray/bytes or as device name string
@@ -278,108 +344,139 @@ class viDataDT(viData):
 
     def _create_from_raw(self, value):
         # set raw value directly
-        if int.from_bytes(value, 'big') in self.devicetypes.keys():
-            super().extend(value)
+        self._value = self.devicetypes.get(int.from_bytes(value, 'big'))
+        if self._value is not None:
+            return value
         else:
             raise viDataException(f'Unknown device code {value.hex()}')
 
     def _create_from_value(self, devicename):
         # devicename given as string
-        if devicename in self.devicetypes.values():
-            devcode = next(key for key, value in self.devicetypes.items() if value == devicename)
-            super().extend(devcode.to_bytes(2, 'big'))
+        raw = _lookup_encoded(self.devicetypes_encoded, devicename)
+        if raw is not None:
+            self._value = self.devicetypes[int.from_bytes(raw, 'big')]
+            return raw
         else:
             raise viDataException(f'Unknown device name {devicename}')
 
     @property
     def value(self):
         # return device type as string
-        return self.devicetypes[int.from_bytes(self, 'big')]
+        return self._value
 
 
 class viDataIS10(viData):
     # IS10 - signed fixed-point integer, 1 decimal
+    __slots__ = ()
     unit = {'code': 'IS10', 'description': 'INT signed 10', 'unit': ''}
+    length = 2  # length in bytes when created from a value
 
-    def __init__(self, value=b'\x00\x00', len=2):
+    def __init__(self, value=b'\x00\x00'):
         # sets int representation based on input value
-        self.len = len  # length in bytes
         super().__init__(value)
 
     def _create_from_value(self, value):
         # fixed-point number given
-        # FIXME Is it ok to overwrite its own value or should a new object be returned?
-        super().extend(int(value * 10).to_bytes(self.len, 'little', signed=True))
+        return _encode_int(int(value * 10), self.length, signed=True)
 
     @property
     def value(self):
-        return int.from_bytes(self, 'little', signed=True) / 10
+        return _decode_int(self, signed=True) / 10
+
+    @classmethod
+    def decode_many(cls, buf):
+        # decodes a buffer of consecutive 2 byte values, returns a list of values
+        return [v / 10 for v in _decode_int_many(buf, signed=True)]
 
 
 class viDataIU10(viData):
     # IS10 - signed fixed-point integer, 1 decimal
+    __slots__ = ()
     unit = {'code': 'IU10', 'description': 'INT unsigned 10', 'unit': ''}
+    length = 2  # length in bytes when created from a value
 
-    def __init__(self, value=b'\x00\x00', len=2):
+    def __init__(self, value=b'\x00\x00'):
         # sets int representation based on input value
-        self.len = len  # length in bytes
         super().__init__(value)
 
     def _create_from_value(self, value):
         # fixed-point number given
-        super().extend(int(value * 10).to_bytes(self.len, 'little', signed=False))
+        return _encode_int(int(value * 10), self.length, signed=False)
 
     @property
     def value(self):
-        return int.from_bytes(self, 'little', signed=False) / 10
+        return _decode_int(self, signed=False) / 10
+
+    @classmethod
+    def decode_many(cls, buf):
+        # decodes a buffer of consecutive 2 byte values, returns a list of values
+        return [v / 10 for v in _decode_int_many(buf, signed=False)]
 
 
 class viDataIU3600(viData):
     # IU3600 - signed fixed-point integer, 1 decimal
+    __slots__ = ()
     unit = {'code': 'IS10', 'description': 'INT signed 10', 'unit': 'h'}
+    length = 2  # length in bytes when created from a value
 
-    def __init__(self, value=b'\x00\x00', len=2):
+    def __init__(self, value=b'\x00\x00'):
         # sets int representation based on input value
-        self.len = len  # length in bytes
         super().__init__(value)
 
     def _create_from_value(self, value):
         # fixed-point number given
-        super().extend(int(value * 3600).to_bytes(self.len, 'little', signed=False))
+        return _encode_int(int(value * 3600), self.length, signed=False)
 
     @property
     def value(self):
         # FIXME round to two digits
-        return int.from_bytes(self, 'little', signed=True) / 3600
+        return _decode_int(self, signed=True) / 3600
+
+    @classmethod
+    def decode_many(cls, buf):
+        # decodes a buffer of consecutive 2 byte values, returns a list of values
+        return [v / 3600 for v in _decode_int_many(buf, signed=True)]
 
 
 class viDataIUNON(viData):
     # IUNON - unsigned int
+    __slots__ = ()
     unit = {'code': 'IUNON', 'description': 'INT unsigned non', 'unit': ''},  # vito unit: UTI, CO
+    length = 2  # length in bytes when created from a value
 
-    def __init__(self, value=b'\x00\x00', len=2):
+    def __init__(self, value=b'\x00\x00'):
         # sets int representation based on input value
-        self.len = len  # length in bytes
         super().__init__(value)
 
     def _create_from_value(self, value):
         # fixed-point number given
-        super().extend(int(value).to_bytes(self.len, 'little', signed=False))
+        return _encode_int(int(value), self.length, signed=False)
 
     @property
     def value(self):
-        return int.from_bytes(self, 'little', signed=False)
+        return _decode_int(self, signed=False)
+
+    @classmethod
+    def decode_many(cls, buf):
+        # decodes a buffer of consecutive 2 byte values, returns a list of values
+        return _decode_int_many(buf, signed=False)
 
 
 class viDataRT(viData):
+    __slots__ = ('_value',)  # decoded value, set on creation
     unit = {'code': 'RT', 'description': 'ReturnStatus', 'unit': ''}
     # operating mode codes are hex numbers
-    returnstatus = {
+    returnstatus = _frozen({
         0x00: '0',
         0x01: '1',
         0x03: '2',
         0xAA: 'Not OK'
-    }
+    })
+    # encoded code byte of each value
+    returnstatus_encoded = _frozen({value: bytes((key,)) for key, value in returnstatus.items()})
+    returnstatus_options = ', '.join(returnstatus.values())  # listed in error messages
+    # validity of a raw code byte, indexed by the byte (1 = known code)
+    returnstatus_valid = bytes(map(returnstatus.__contains__, range(256)))
 
     def __init__(self, value=b'\x00'):
         # sets operating mode (hex) based on string opmode
@@ -387,71 +484,85 @@ class viDataRT(viData):
         super().__init__(value)
 
     def _create_from_value(self, status):
-        if status in self.returnstatus.values():
-            opcode = next(key for key, value in self.returnstatus.items() if value == status)
-            super().extend(opcode.to_bytes(1, 'big'))
+        raw = _lookup_encoded(self.returnstatus_encoded, status)
+        if raw is not None:
+            self._value = self.returnstatus[raw[0]]
+            return raw
         else:
-            raise viDataException(f'Unknown return status {status}. Options are {self.returnstatus.values()}')
+            raise viDataException(f'Unknown return status {status}. Options are {self.returnstatus_options}')
 
     def _create_from_raw(self, value):
         # set raw value directly
-        if int.from_bytes(value, 'big') in self.returnstatus.keys():
-            super().extend(value)
+        if len(value) == 1 and self.returnstatus_valid[value[0]]:
+            self._value = self.returnstatus[value[0]]
+            return value
         else:
             raise viDataException(f'Unknown return status {value.hex()}')
 
     @property
     def value(self):
-        return self.returnstatus[int.from_bytes(self, 'big')]
+        return self._value
 
 
 class viDataOO(viData):
+    __slots__ = ('_value',)  # decoded value, set on creation
     unit = {'code': 'OO', 'description': 'OnOff', 'unit': ''}
     # operating mode codes are hex numbers
-    OnOff = {
+    OnOff = _frozen({
         0x00: 'Off',
         0x01: 'Manual',
         0x02: 'On',
-    }
+    })
+    # encoded code byte of each value
+    OnOff_encoded = _frozen({value: bytes((key,)) for key, value in OnOff.items()})
+    OnOff_options = ', '.join(OnOff.values())  # listed in error messages
+    # validity of a raw code byte, indexed by the byte (1 = known code)
+    OnOff_valid = bytes(map(OnOff.__contains__, range(256)))
 
     def __init__(self, value='Off'):
         super().__init__(value)
 
     def _create_from_value(self, onoff):
-        if onoff in self.OnOff.values():
-            opcode = next(key for key, value in self.OnOff.items() if value == onoff)
-            super().extend(opcode.to_bytes(1, 'big'))
+        raw = _lookup_encoded(self.OnOff_encoded, onoff)
+        if raw is not None:
+            self._value = self.OnOff[raw[0]]
+            return raw
         else:
-            raise viDataException(f'Unknown value {onoff}. Options are {self.OnOff.values()}')
+            raise viDataException(f'Unknown value {onoff}. Options are {self.OnOff_options}')
 
     def _create_from_raw(self, value):
         # set raw value directly
-        if int.from_bytes(value, 'big') in self.OnOff.keys():
-            super().extend(value)
+        if len(value) == 1 and self.OnOff_valid[value[0]]:
+            self._value = self.OnOff[value[0]]
+            return value
         else:
             raise viDataException(f'Unknown value {value.hex()}')
 
     @property
     def value(self):
-        return self.OnOff[int.from_bytes(self, 'big')]
+        return self._value
 
 
 LITTLE_ENDIAN_4_CHAR_6_SHORT = '<4B6H'
 MILLENIUM = 2000
 HEATING_ENERGY_FACTOR = 0.1
+_ENERGY_STRUCT = Struct(LITTLE_ENDIAN_4_CHAR_6_SHORT)
 
 
 class viDataEnergy(viData):
     """ Energy-Type ... Return from Function-Call B800 """
+    __slots__ = ('day', 'year', 'week', 'heating_energy', 'heating_electrical_energy', 'water_energy',
+                 'water_electrical_energy', 'cooling_energy', 'cooling_electrical_energy', 'total_energy',
+                 'total_electrical_energy')
     unit = {'code': 'F_E', 'description': 'returns dictionary with energy data', 'unit': ''},
 
     def __init__(self, value=bytes(16)):
         super().__init__(value)
 
     def _create_from_raw(self, value):
-        super().extend(value)
-        self.len = len(value)
-        raw_data = unpack(LITTLE_ENDIAN_4_CHAR_6_SHORT, value)
+        # record layout: 4 bytes (day, year, week), 6 shorts (heating, water and cooling energy, each thermal and
+        # electrical)
+        raw_data = _ENERGY_STRUCT.unpack_from(value)
         self.day = raw_data[1]
         self.year = MILLENIUM + raw_data[2]
         self.week = raw_data[3]
@@ -459,8 +570,12 @@ class viDataEnergy(viData):
         self.heating_electrical_energy = raw_data[5] * HEATING_ENERGY_FACTOR
         self.water_energy = raw_data[6] * HEATING_ENERGY_FACTOR
         self.water_electrical_energy = raw_data[7] * HEATING_ENERGY_FACTOR
-        self.cooling_energy = raw_data[4] * HEATING_ENERGY_FACTOR
-        self.cooling_electrical_energy = raw_data[5] * HEATING_ENERGY_FACTOR
+        self.cooling_energy = raw_data[8] * HEATING_ENERGY_FACTOR
+        self.cooling_electrical_energy = raw_data[9] * HEATING_ENERGY_FACTOR
+        self.total_energy = self.heating_energy + self.water_energy + self.cooling_energy
+        self.total_electrical_energy = \
+            self.heating_electrical_energy + self.water_electrical_energy + self.cooling_electrical_energy
+        return value
 
     def _create_from_value(self, value):
         raise viDataException(f'viDataEnergy can only be created from bytes.')
@@ -468,28 +583,27 @@ class viDataEnergy(viData):
     @property
     def value(self):
         """ decode the Result Record and return a dictionary. """
-
-        total_energy = self.heating_energy + self.water_energy + self.cooling_energy
-        total_electrical_energy = \
-            self.heating_electrical_energy + self.water_electrical_energy + self.cooling_electrical_energy
-
-        value_dictionary = {'day': self.day, 'week': self.week, 'year': self.year,
-                            'heating_energy': self.heating_energy,
-                            'heating_electrical_energy': self.heating_electrical_energy,
-                            'water_energy': self.water_energy,
-                            'water_electrical_energy': self.water_electrical_energy,
-                            'cooling_energy': self.cooling_energy,
-                            'cooling_electrical_energy': self.cooling_electrical_energy,
-                            'total_energy': total_energy,
-                            'total_electrical_energy': total_electrical_energy,
-                            }
-
-        return value_dictionary
-
-
-system_schemes = {
+        return {'day': self.day, 'week': self.week, 'year': self.year,
+                'heating_energy': self.heating_energy,
+                'heating_electrical_energy': self.heating_electrical_energy,
+                'water_energy': self.water_energy,
+                'water_electrical_energy': self.water_electrical_energy,
+                'cooling_energy': self.cooling_energy,
+                'cooling_electrical_energy': self.cooling_electrical_energy,
+                'total_energy': self.total_energy,
+                'total_electrical_energy': self.total_electrical_energy,
+                }
+
+
+# unit code -> data type class, used by viData.create
+_DATATYPE_OBJECT = {'BA': viDataBA, 'DT': viDataDT, 'IS10': viDataIS10, 'IU10': viDataIU10,
+                    'IU3600': viDataIU3600, 'IUNON': viDataIUNON, 'RT': viDataRT, 'OO': viDataOO,
+                    'ES': viDataES, 'F_E': viDataEnergy,
+                    }
+
+system_schemes = _frozen({
     '01': 'WW',
     '02': 'HK + WW',
     '04': 'HK + WW',
     '05': 'HK + WW'
-}
+})
@@ -18,8 +18,12 @@
 # ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ##
 
 import logging
+from itertools import product
 from pyvcontrol.viCommand import viCommand
 
+# single byte objects indexed by their value (avoids int.to_bytes for length and checksum bytes)
+_BYTE = tuple(bytes((i,)) for i in range(256))
+
 
 class viTelegramException(Exception):
     pass
@@ -28,6 +32,8 @@ class viTelegramException(Exception):
 class viTelegram(bytearray):
     # represents a telegram (header, viCommand, payload and checksum)
 
+    __slots__ = ('vicmd', 'tType', 'tMode', 'payload')
+
     # P300 Protokoll (thanks to M.Wenzel, SmartHomeNG plugin)
     #
     # Beispiel
@@ -93,7 +99,13 @@ class viTelegram(bytearray):
     tModes = {'read': b'\x01',
               'write': b'\x02',
               'call': b'\x07'}
+    # inverse maps, keyed by the byte value (tType/tMode may be bytes or bytearray)
+    _tTypesInv = {value[0]: key for key, value in tTypes.items()}
+    _tModesInv = {value[0]: key for key, value in tModes.items()}
+    # type and mode bytes of the header for all known combinations, keyed by (type, mode) byte values
+    _tHeaderTails = {(tt[0], tm[0]): tt + tm for tt, tm in product(tTypes.values(), tModes.values())}
     tStartByte = b'\x41'
+    _tStartByteValue = tStartByte[0]  # start byte as int, compared against packet[0]
 
     def __init__(self, vc: viCommand, tMode='Read', tType='Request', payload=bytearray(0)):
         # creates a telegram for sending as a combination of header, viCommand, payload and checksum
@@ -107,7 +119,7 @@ class viTelegram(bytearray):
 
         # -- create bytearray representation
         b = self._header() + self.vicmd + self.payload
-        super().__init__(b + self._checksum_byte(b))
+        super().__init__(b + self._checksum_fast(b))
 
     def _header(self):
         """ Create viTelegram header"""
@@ -116,7 +128,11 @@ class viTelegram(bytearray):
         #
         # Data length (bytes): type (1), mode (1), command code (x), payload viData (x)
         data_length = 2 + len(self.vicmd) + len(self.payload)
-        return self.tStartByte + data_length.to_bytes(1, 'big') + self.tType + self.tMode
+        tail = self._tHeaderTails.get((self.tType[0], self.tMode[0]))
+        if tail is None:
+            # raw type or mode outside of tTypes/tModes
+            tail = self.tType + self.tMode
+        return self.tStartByte + _BYTE[data_length] + tail
 
     @property
     def response_length(self):
@@ -132,12 +148,12 @@ class viTelegram(bytearray):
     @property
     def telegram_mode(self):
         # returns mode (read, write, function call)
-        return next(key for key, value in self.tModes.items() if value == self.tMode)
+        return self._tModesInv[self.tMode[0]]
 
     @property
     def telegram_type(self):
         # Request/response/Error
-        return next(key for key, value in self.tTypes.items() if value == self.tType)
+        return self._tTypesInv[self.tType[0]]
 
     @classmethod
     def from_bytes(cls, b: bytearray):
@@ -146,29 +162,37 @@ class viTelegram(bytearray):
         # Telegram bytes are [0:4]->header, [4:6]->command code, [6]->payload length, [7:-2]-> payload, [-1]:-> checksum
         # header bytes are [0]-> Startbyte, [1]:total value byte length,[2]: type, [3] mode
 
-        # validate checksum
-        if b[-1:] != viTelegram._checksum_byte(b[0:-1]):
-            raise viTelegramException(
-                f'Checksum not valid. Expected {b[-1:]}, Calculated {viTelegram._checksum_byte(b[0:-1])}')
-        # validate Startbyte
-        if b[0:1] != cls.tStartByte:
-            raise viTelegramException('Startbyte not found')
-
-        header = b[0:4]
-        logging.debug(
-            f'Header: {header.hex()}, tType={header[2:3].hex()}, tMode={header[3:4].hex()}, payload={b[7:-1].hex()}')
-        vicmd = viCommand._from_bytes(b[4:6])
-        vt = viTelegram(vicmd, tType=header[2:3], tMode=header[3:4], payload=b[7:-1])
+        # the telegram is parsed through a memoryview, only the parts kept in the telegram are copied
+        with memoryview(b) as mv:
+            # validate checksum
+            checksum = viTelegram._checksum_byte(mv[0:-1])
+            if len(mv) == 0 or mv[-1] != checksum[0]:
+                raise viTelegramException(f'Checksum not valid. Expected {bytes(mv[-1:])}, Calculated {checksum}')
+            # validate Startbyte
+            if mv[0] != cls._tStartByteValue:
+                raise viTelegramException('Startbyte not found')
+
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(
+                    f'Header: {mv[0:4].hex()}, tType={mv[2:3].hex()}, tMode={mv[3:4].hex()}, payload={mv[7:-1].hex()}')
+            vicmd = viCommand._from_bytes(mv[4:6])
+            vt = viTelegram(vicmd, tType=bytes(mv[2:3]), tMode=bytes(mv[3:4]), payload=bytes(mv[7:-1]))
         return vt
 
+    @staticmethod
+    def _checksum_fast(packet):
+        # checksum of a packet built by this class (starts with the start byte, no validation)
+        # the start byte is subtracted by the start value of the sum instead of slicing packet[1:]
+        return _BYTE[sum(packet, -packet[0]) & 0xFF]
+
     @classmethod
     def _checksum_byte(cls, packet):
         # checksum is the last byte of the sum of all bytes in packet
         checksum = 0
         if len(packet) == 0:
             logging.error('No bytes received to calculate checksum')
-        elif packet[0:1] != cls.tStartByte:
+        elif packet[0] != cls._tStartByteValue:
             logging.error('bytes to calculate checksum from does not start with start byte')
         else:
             checksum = sum(packet[1:]) % 256
-        return checksum.to_bytes(1, 'big')
+        return _BYTE[checksum]
@@ -32,14 +32,19 @@ def viscancommands(addressrange):
     vo = viControl()
     vo.initialize_communication()
 
+    # payload lengths to try and their byte representation, encoded once for all addresses
+    lengths = [(kk, kk.to_bytes(1, 'big')) for kk in range(1, 5)]
+
     for addr in addressrange:
-        for kk in range(1, 5):
+        address = addr.to_bytes(2, 'big')
+        for kk, length in lengths:
             # TODO: Inneren Teil ausschneiden und in separate Funktion? ("low level read command")
             logging.debug(f'---{hex(addr)}-{kk}------------------')
-            vc = addr.to_bytes(2, 'big') + kk.to_bytes(1, 'big')
+            vc = address + length
             vt = viTelegram(vc, 'read')  # create read Telegram
             vo.vs.send(vt)  # send Telegram
-            logging.debug(f'Send telegram {vt.hex()}')
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(f'Send telegram {vt.hex()}')
 
             try:
                 # Check if sending was successfull
@@ -53,7 +58,8 @@ def viscancommands(addressrange):
                 vr1 = vo.vs.read(2)  # receive response
                 vr2 = vo.vs.read(vr1[1] + 1)  # read rest of telegram
                 # FIXME: create Telegram instead of low-level access (for better readability)
-                logging.debug(f'received telegram {vr1.hex()} {vr2.hex()}')
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug(f'received telegram {vr1.hex()} {vr2.hex()}')
 
                 if vr2[0].to_bytes(1, 'little') == viTelegram.tTypes['response']:
                     v = int.from_bytes(vr2[-1 - kk:-1], 'little')
@@ -85,18 +91,25 @@ def vimonitor(command_list, updateinterval=30):
 
     loop_monitor = True
     while loop_monitor:
-        standard_screen.clear()
+        # erase only clears the window buffer, refresh then writes the changed cells instead of repainting the terminal
+        standard_screen.erase()
         standard_screen.addstr(0, 0, 'Reading values...')
         standard_screen.refresh()
-        standard_screen.addstr(1, 0, "--- Viessmann monitor ---\n")
+        values = []
+        error = None
         try:
             vo.initialize_communication()
             for c in command_list:
-                v = vo.execReadCmd(c).value
-                standard_screen.addstr(f"{c}: ", curses.A_BOLD)
-                standard_screen.addstr(f"{v}\n")
+                values.append((c, vo.execReadCmd(c).value))
         except Exception as e:
-            standard_screen.addstr(f'Error: {e}')
+            error = e
+        # write the values after all commands are read, command names in bold
+        standard_screen.addstr(1, 0, "--- Viessmann monitor ---\n")
+        for c, v in values:
+            standard_screen.addstr(f"{c}: ", curses.A_BOLD)
+            standard_screen.addstr(f"{v}\n")
+        if error is not None:
+            standard_screen.addstr(f'Error: {error}')
 
         standard_screen.addstr('\n-----------------------\nPress any key to abort')
         for k in range(updateinterval):
@@ -112,17 +125,50 @@ def vimonitor(command_list, updateinterval=30):
     curses.endwin()
 
 
+def _restart_communication(vo):
+    # responses still pending would be taken as acknowledge by the initialization: wait until the line is quiet,
+    # then start over with a clean interface
+    vo.vs.drain_input()
+    try:
+        vo.initialize_communication()
+    except viControlException as e:
+        logging.error({e})
+        print(f'Could not re-initialize communication: {e}')
+
+
+def _try_function_call(vo, commandname, func, day):
+    # single function call, returns None if the heating answers with an error or the communication fails
+    try:
+        return vo.try_execute_function_call(commandname, func, day)
+    except Exception as e:
+        logging.error({e})
+        print(f'Day {day}: An exception occurred: {e}')
+        _restart_communication(vo)
+        return None
+
+
 def vi_scan_function_call(commandname, functionrange):
     # scans the function call with all parameters and print HEX and decoded OUTPUT in terminal
 
     vo = viControl()
     vo.initialize_communication()
 
+    days = range(0, 6)
     for func in functionrange:  # First Parameter is Byte
         print(f"==========Function # {func}===========")
-        for day in range(0, 6):
-            try:
-                print(vo.execFunctionCall(commandname, func, day).valueScan)
-            except Exception as e:
-                logging.error({e})
-                print(f'Day {day}: An exception occurred: {e}')
+        # the calls for all days are sent at once, the responses are read afterwards
+        # days answered with an error return None, exceptions are left for communication failures
+        try:
+            results = vo.execute_function_calls(commandname, [(func, day) for day in days], raise_on_error=False)
+        except Exception as e:
+            # e.g. an interface that drops queued telegrams: call the days one by one instead
+            logging.error({e})
+            print(f'An exception occurred: {e}. Calling the days one by one')
+            _restart_communication(vo)
+            results = [_try_function_call(vo, commandname, func, day) for day in days]
+        for day, vd in zip(days, results):
+            if vd is None:
+                logging.debug(f'Function {func}, day {day}: no result')
+                print(f'Day {day}: error')
+                continue
+            print(f'Day {day}: {vd.value}')
@@ -18,7 +18,7 @@
 # ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ## ##
 
 import unittest
-from pyvcontrol.viCommand import viCommand,viCommandException
+from pyvcontrol.viCommand import viCommand,viCommandException, ADDRESS, LENGTH, UNIT
 from pyvcontrol.viData import viData
 
 
@@ -61,5 +61,17 @@ class testViCommand(unittest.TestCase):
         vc = viCommand('Betriebsmodus')
         self.assertEqual(vc.unit,'BA')
 
+    def test_vicmdaddedinplace(self):
+        # commands added to the command set after the address index was built are found
+        viCommand._from_bytes(b'\x00\xf8')
+        viCommand.command_set['TestAddedCommand'] = {ADDRESS: 'abcd', LENGTH: 2, UNIT: 'IUNON'}
+        try:
+            vc = viCommand._from_bytes(b'\xab\xcd')
+            self.assertEqual(vc.command_name, 'TestAddedCommand')
+        finally:
+            del viCommand.command_set['TestAddedCommand']
+        with self.assertRaises(viCommandException):
+            viCommand._from_bytes(b'\xab\xcd')
+
 if __name__ == '__main__':
     unittest.main()
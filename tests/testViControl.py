@@ -19,9 +19,12 @@
 
 # test cases for class viControl
 
+import logging
 import unittest
 from unittest.mock import patch
-from pyvcontrol.viControl import viControl, viControlException, control_set, ctrlcode
+from pyvcontrol.viControl import viControl, viControlException, viSerial, control_set, ctrlcode
+from pyvcontrol.viCommand import viCommand, ADDRESS, LENGTH, UNIT
+from pyvcontrol.viData import viDataException
 
 
 class MockViSerial:
@@ -43,17 +46,100 @@ class MockViSerial:
         self._connected = False
 
     def send(self, payload):
-        self.sink = self.sink + bytearray(payload)
-        print(f"received {payload}, in total received {self.sink}")
+        self.sink.extend(payload)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'received {payload}, in total received {self.sink}')
 
-    def read(self, length):
-        answer = self.source[self.source_cursor:self.source_cursor + length]
+    @property
+    def source(self):
+        return self._source
+
+    @source.setter
+    def source(self, data):
+        # reads are served from a memoryview of the data, so only the requested bytes are copied
+        self._source = data
+        self._source_view = memoryview(data)
+
+    def read(self, length, retries=10):
+        answer = bytes(self._source_view[self.source_cursor:self.source_cursor + length])
         self.source_cursor += length
         return answer
 
+    def reset_input_buffer(self):
+        self.source_cursor = len(self.source)
+
+    def drain_input(self):
+        self.source_cursor = len(self.source)
+
+
+class MockSerial:
+    # simulates pyserial, each read returns the next chunk (at most the requested number of bytes)
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.written = bytearray(0)
+
+    def read(self, size=1):
+        return self.chunks.pop(0)[:size] if self.chunks else b''
+
+    def write(self, data):
+        self.written.extend(data)
+
+    def reset_input_buffer(self):
+        self.chunks.clear()
+
+    def close(self):
+        pass
+
+
+class TestViSerial(unittest.TestCase):
+
+    def test_read_chunks(self):
+        vs = viSerial(control_set, '')
+        vs._serial = MockSerial([b'\x41\x07', b'', b'\x01\x01\x01'])
+        self.assertEqual(vs.read(5), b'\x41\x07\x01\x01\x01')
+
+    def test_read_retries(self):
+        vs = viSerial(control_set, '')
+        vs._serial = MockSerial([b'', b'\x06'])
+        self.assertEqual(vs.read(1, retries=1), b'')
+
+    def test_disconnect_twice(self):
+        vs = viSerial(control_set, '')
+        vs._serial = MockSerial([])
+        vs.disconnect()
+        vs.disconnect()
+        self.assertFalse(vs._connected)
+
+    def test_drain_input(self):
+        # bytes are discarded until a read times out, later bytes are kept
+        vs = viSerial(control_set, '')
+        vs._serial = MockSerial([b'\x41\x07', b'\x01', b'', b'\x06'])
+        vs._connected = True
+        vs.drain_input()
+        self.assertEqual(vs.read(1), b'\x06')
+
+    def test_connect_fails(self):
+        # a port that cannot be opened is reported right away, not by the first read
+        vs = viSerial(control_set, '')
+        with self.assertRaises(viControlException):
+            vs.connect()
+        self.assertFalse(vs._connected)
+
+    def test_read_timeout(self):
+        vs = viSerial(control_set, '')
+        vs._serial = MockSerial([b'\x06'])
+        self.assertEqual(vs.read(3), b'\x06')
+
 
 class TestViControl(unittest.TestCase):
 
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_context_manager(self, mock1):
+        with viControl() as vc:
+            self.assertTrue(mock1.return_value._connected)
+        self.assertFalse(mock1.return_value._connected)
+
     @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
     def test_exec_forbidden_write_command(self, mock1):
         mock1.return_value.source = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
@@ -63,9 +149,10 @@ class TestViControl(unittest.TestCase):
 
     @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
     def test_exec_write_command(self, mock1):
-        mock1.return_value.source = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 19 00 7e')
+        mock1.return_value.source = ctrlcode['acknowledge'] + bytes.fromhex('41 05 01 02 60 00 02 6a')
         vc = viControl()
         vc.execute_write_command('SolltempWarmwasser', 35)
+        self.assertEqual(mock1.return_value.sink.hex(), '410700026000025e01ca' + '06')
 
     @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
     def test_exec_read_command(self, mock1):
@@ -73,15 +160,155 @@ class TestViControl(unittest.TestCase):
         vc = viControl()
         data = vc.execute_read_command('Warmwassertemperatur')
         self.assertEqual(data.value, 10.1)
+        # the response is acknowledged right away, not with the next packet
+        self.assertEqual(mock1.return_value.sink.hex(), '41050001010d0216' + '06')
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_read_command_exchanged_command_set(self, mock1):
+        # cached commands must follow an exchanged command set
+        mock1.return_value.source = (ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
+                                     + ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 01 02 65 00 72'))
+        vc = viControl()
+        vc.execute_read_command('Warmwassertemperatur')
+        command_set = {'Warmwassertemperatur': {ADDRESS: '0101', LENGTH: 2, UNIT: 'IS10'}}
+        with patch.object(viCommand, 'command_set', command_set):
+            vc.execute_read_command('Warmwassertemperatur')
+        self.assertIn(bytes.fromhex('41 05 00 01 01 01 02 0a'), mock1.return_value.sink)
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_read_command_added_in_place(self, mock1):
+        # commands may be added to the command set after other commands have been executed
+        mock1.return_value.source = (ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
+                                     + ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 ab cd 02 65 00 e8'))
+        vc = viControl()
+        vc.execute_read_command('Warmwassertemperatur')
+        viCommand.command_set['TestAddedCommand'] = {ADDRESS: 'abcd', LENGTH: 2, UNIT: 'IUNON'}
+        try:
+            self.assertEqual(vc.execute_read_command('TestAddedCommand').value, 101)
+        finally:
+            del viCommand.command_set['TestAddedCommand']
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_read_commands(self, mock1):
+        response = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
+        mock1.return_value.source = response + response
+        vc = viControl()
+        data = vc.execute_read_commands(['Warmwassertemperatur', 'Warmwassertemperatur'])
+        self.assertEqual([d.value for d in data], [10.1, 10.1])
+        # both telegrams are sent before the responses are read, each response is acknowledged once
+        self.assertEqual(mock1.return_value.sink.hex(), '41050001010d0216' * 2 + '06' * 2)
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_read_commands_error(self, mock1):
+        # error response in the middle of a batch: all responses are read (and acknowledged) before raising
+        response = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
+        error = ctrlcode['acknowledge'] + bytes.fromhex('41 07 03 01 01 0d 02 65 00 80')
+        mock1.return_value.source = response + error + response
+        vc = viControl()
+        with self.assertRaises(viControlException):
+            vc.execute_read_commands(['Warmwassertemperatur'] * 3)
+        self.assertEqual(mock1.return_value.source_cursor, len(mock1.return_value.source))
+        self.assertEqual(mock1.return_value.sink.hex(), '41050001010d0216' * 3 + '06' * 3)
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_read_commands_invalid_payload(self, mock1):
+        # a response in the middle of a batch cannot be decoded: the remaining responses are read before raising
+        response = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
+        invalid = ctrlcode['acknowledge'] + bytes.fromhex('41 06 01 01 b0 00 01 09 c2')  # unknown operating mode
+        later = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 66 00 7f')
+        mock1.return_value.source = response + invalid + response + later
+        vc = viControl()
+        with self.assertRaises(viDataException):
+            vc.execute_read_commands(['Warmwassertemperatur', 'Betriebsmodus', 'Warmwassertemperatur'])
+        self.assertEqual(mock1.return_value.sink.hex(),
+                         '41050001010d0216' + '41050001b00001b7' + '41050001010d0216' + '06' * 3)
+        # the next command gets its own response, not one left over from the batch
+        self.assertEqual(vc.execute_read_command('Warmwassertemperatur').value, 10.2)
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_read_commands_misaligned(self, mock1):
+        # a response to another command is not taken as valid, the rest of the input is discarded
+        response = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
+        error = ctrlcode['acknowledge'] + bytes.fromhex('41 07 03 01 01 0d 02 65 00 80')
+        mock1.return_value.source = error + response + response
+        vc = viControl()
+        with self.assertRaises(viControlException):
+            vc.execute_read_commands(['Warmwassertemperatur', 'Aussentemperatur'])
+        with self.assertRaises(viControlException):
+            vc.execute_read_command('Aussentemperatur')
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_function_calls(self, mock1):
+        energy = bytes.fromhex('00 01 16 09 92 03 aa 00 99 00 d7 00 00 00 00 00')
+        response = bytes.fromhex('41 15 01 07 b8 00 10') + energy
+        response = ctrlcode['acknowledge'] + response + bytes(((sum(response) - 0x41) % 256,))
+        mock1.return_value.source = response + response
+        vc = viControl()
+        data = vc.execute_function_calls('Energiebilanz', [(1, 0), (1, 1)])
+        self.assertEqual([d.value['heating_energy'] for d in data], [91.4, 91.4])
+        # both telegrams are sent before the responses are read
+        self.assertEqual(mock1.return_value.sink[0:22].hex(), '41080007b80010020100da' + '41080007b80010020101db')
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_try_exec_function_call_error(self, mock1):
+        response = bytes.fromhex('41 15 03 07 b8 00 10') + bytes(16)
+        response = ctrlcode['acknowledge'] + response + bytes(((sum(response) - 0x41) % 256,))
+        mock1.return_value.source = response + response
+        vc = viControl()
+        self.assertIsNone(vc.try_execute_function_call('Energiebilanz', 1, 0))
+        self.assertEqual(mock1.return_value.sink[-1:], ctrlcode['acknowledge'])
+        with self.assertRaises(viControlException):
+            vc.execute_function_call('Energiebilanz', 1, 0)
+        # both calls leave the line in the same state: the error telegram is acknowledged
+        self.assertEqual(mock1.return_value.sink[-1:], ctrlcode['acknowledge'])
 
     @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
     def test_exec_function_call(self, mock1):
         vc = viControl()
         self.assertFalse(True)
 
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_exec_function_call_argument_range(self, mock1):
+        vc = viControl()
+        with self.assertRaises(viControlException):
+            vc.execute_function_call('Energiebilanz', 256)
+        with self.assertRaises(viControlException):
+            vc.execute_function_call('Energiebilanz', *range(7), 256)
+        with self.assertRaises(viControlException):
+            vc.execute_function_call('Energiebilanz', *range(8), 256)
+        self.assertEqual(mock1.return_value.sink, b'')
+
     @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
     def test_exec_forbidden_function_call(self, mock1):
         mock1.return_value.source = ctrlcode['acknowledge'] + bytes.fromhex('41 07 01 01 01 0d 02 65 00 7e')
         vc = viControl()
         with self.assertRaises(viControlException):
             vc.execute_function_call('Warmwassertemperatur', 5)
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_initialize_communication(self, mock1):
+        mock1.return_value.source = ctrlcode['not_init'] + ctrlcode['acknowledge']
+        vc = viControl()
+        self.assertTrue(vc.initialize_communication())
+        self.assertEqual(mock1.return_value.sink, ctrlcode['sync_cmd'])
+
+    @patch('pyvcontrol.viControl.viSerial', return_value=MockViSerial())
+    def test_initialize_communication_timeout(self, mock1):
+        # nothing received: reset and sync are sent together
+        mock1.return_value.source = bytes(0)
+        vc = viControl()
+        with self.assertRaises(viControlException):
+            vc.initialize_communication()
+        # reset and sync are only combined in the first step, afterwards only reset is sent
+        self.assertEqual(mock1.return_value.sink,
+                         ctrlcode['reset_cmd'] + ctrlcode['sync_cmd'] + ctrlcode['reset_cmd'] * 9)
+
+    def test_initialize_communication_late_sync(self):
+        # silent interface reports not_init before it processes the sync sent with the reset: no second sync
+        vs = viSerial(control_set, '')
+        vs._serial = MockSerial([b'', ctrlcode['not_init'], ctrlcode['acknowledge']])
+        vs._connected = True
+        with patch('pyvcontrol.viControl.viSerial', return_value=vs):
+            vc = viControl()
+            self.assertTrue(vc.initialize_communication())
+        self.assertEqual(vs._serial.written, ctrlcode['reset_cmd'] + ctrlcode['sync_cmd'])
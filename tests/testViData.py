@@ -19,8 +19,9 @@
 
 # test cases for class viData
 
+import json
 import unittest
-from pyvcontrol.viData import viData as vd, viDataException
+from pyvcontrol.viData import viData as vd, viDataException, viDataIS10, viDataIUNON
 
 
 class viDataTestCaseBA(unittest.TestCase):
@@ -49,6 +50,11 @@ class viDataTestCaseBA(unittest.TestCase):
         with self.assertRaises(viDataException):
             vd.create('BA', 'foobar')
 
+    def test_BAunhashable(self):
+        # test call with a value that cannot be looked up
+        with self.assertRaises(viDataException):
+            vd.create('BA', ['WW'])
+
 
 class viDataTestCaseDT(unittest.TestCase):
     def test_DTempty(self):
@@ -66,6 +72,25 @@ class viDataTestCaseDT(unittest.TestCase):
         self.assertEqual(dDT, b'\x00\x00')
 
 
+class viDataTestCaseES(unittest.TestCase):
+    def test_ESempty(self):
+        dES = vd.create('ES')
+        self.assertEqual(dES.value, 'Regelbetrieb (kein Fehler)')
+
+    def test_ESraw(self):
+        dES = vd.create('ES', b'\xF4')
+        self.assertEqual(dES.value, 'Flammensigal nicht vorhanden')
+
+    def test_ESunknown(self):
+        with self.assertRaises(viDataException):
+            vd.create('ES', b'\x01')
+
+    def test_ESreadonly(self):
+        # lookup tables are shared by all instances and must not be modified
+        with self.assertRaises(TypeError):
+            vd.create('ES').errorset[0x01] = 'foo'
+
+
 class viDataTestCaseIS10(unittest.TestCase):
     def test_IS10(self):
         dIS10 = vd.create('IS10', 10.15)
@@ -81,6 +106,15 @@ class viDataTestCaseIS10(unittest.TestCase):
         print(f'Hex representation of {f} is {dIS10.hex()}')
         self.assertEqual(dIS10.value, -9.8)
 
+    def test_IS10overflow(self):
+        with self.assertRaises(viDataException):
+            vd.create('IS10', 3276.8)
+
+    def test_IS10many(self):
+        self.assertEqual(viDataIS10.decode_many(b'e\x00\x9f\xff'), [10.1, -9.7])
+        with self.assertRaises(viDataException):
+            viDataIS10.decode_many(b'e\x00\x9f')
+
     # TODO add test playing with different len arguments and limit values
 
 
@@ -95,6 +129,9 @@ class viDataTestCaseIUNON(unittest.TestCase):
         dIUNON = vd.create('IUNON', b'\x9f\x01')
         self.assertEqual(dIUNON.value, 415)
 
+    def test_IUNONmany(self):
+        self.assertEqual(viDataIUNON.decode_many(b'\x9f\x01\x01\x00'), [415, 1])
+
 
 class viDataTestCaseOO(unittest.TestCase):
     def test_OO(self):
@@ -142,14 +179,28 @@ class viDataTestCaseEnergy(unittest.TestCase):
             'heating_electrical_energy': 17.0,
             'water_energy': 15.3,
             'water_electrical_energy': 4.5,
-            'cooling_energy': 91.4,
-            'cooling_electrical_energy': 17.0,
-            'total_energy': 91.4 + 15.3 + 91.4,
-            'total_electrical_energy': 38.5,
+            'cooling_energy': 0.0,
+            'cooling_electrical_energy': 0.0,
+            'total_energy': 91.4 + 15.3,
+            'total_electrical_energy': 21.5,
         }
 
         self.assertEqual(value_dictionary, reference_dictionary)
 
+    def test_cooling_values(self):
+        example_data = bytes.fromhex('02 02 16 09 00 00 00 00 00 00 00 00 92 03 aa 00')
+        data_energy = vd.create('F_E', example_data)
+        self.assertEqual(data_energy.cooling_energy, 91.4)
+        self.assertEqual(data_energy.cooling_electrical_energy, 17.0)
+        self.assertEqual(data_energy.heating_energy, 0)
+
+    def test_value_copy(self):
+        # each access returns a plain dictionary, modifying it does not change the data
+        data_energy = vd.create('F_E', bytes(16))
+        data_energy.value['day'] = 99
+        self.assertEqual(data_energy.value['day'], 0)
+        self.assertEqual(json.loads(json.dumps(data_energy.value)), data_energy.value)
+
     def test_failed_init(self):
         example_data = 1.2
         with self.assertRaises(viDataException):
@@ -44,6 +44,11 @@ class testviTelegram(unittest.TestCase):
         c = v.viTelegram._checksum_byte(b'\x42\x41')
         self.assertEqual(b'\x00', c)
 
+    def test_checksumCarry(self):
+        # checksum is the low byte of the sum, carries of the bytes must not leak into it
+        c = v.viTelegram._checksum_byte(b'\x41' + b'\xff' * 17)
+        self.assertEqual((17 * 0xff % 256).to_bytes(1, 'big'), c)
+
 
 class testviTelegram_resp(unittest.TestCase):
     def test_wrongchecksum(self):
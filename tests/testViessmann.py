@@ -30,9 +30,11 @@ class MyTestCase(unittest.TestCase):
         vo = viControl()
         vo.initialize_communication()
 
-        for cmd in viCommand.command_set.keys():
-            vd = vo.execReadCmd(cmd)
-            print(f'{cmd} : {vd.value}')
+        # resolve the commands once, the loop only talks to the heating
+        commands = [viCommand(cmd) for cmd in viCommand.command_set.keys()]
+        for vc in commands:
+            vd = vo.execute_command(vc, 'read')
+            print(f'{vc.command_name} : {vd.value}')
 
     def test_readonly(self):
         pass
@@ -22,18 +22,31 @@
 
 
 from pyvcontrol.viData import viData
-from pyvcontrol.viCommand import viCommand
+from pyvcontrol.viControl import _get_vicommand
 import random
 
 
+def _check_command(cmdName):
+    # raises viCommandException for unknown commands like the real viControl
+    # uses the command cache of viControl, which follows an exchanged command set
+    _get_vicommand(cmdName)
+
+
 class viControlMock:
+    # plain class (no MagicMock) so that calls are cheap, supports the context manager protocol of viControl
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
     def initialize_communication(self):
         return True
 
     def execute_read_command(self, cmdName):
-        vc = viCommand(cmdName)
+        _check_command(cmdName)
         return viData.create('IUNON', random.randint(0, 50))
 
     def execute_write_command(self, cmdName, value):
-        vc = viCommand(cmdName)
+        _check_command(cmdName)
         return None